@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Mock analysis generators for the Gemini service.
+
+These are pure module-level functions: they capture no service state, so
+they live outside the GeminiService class body (keeping the hot class
+small) and can be memoized directly. All shared payloads and template
+dicts in this module are read-only by convention.
+"""
+import sys
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Linear-time regex engine when available: google-re2 compiles to a DFA
+# and cannot backtrack catastrophically on megabyte inputs. The pattern
+# below is backtracking-safe under stdlib re as well (no nested
+# quantifiers), so the fallback is only slower, not riskier.
+try:
+    import re2 as _re
+except ImportError:
+    import re as _re
+
+# Compiled once at import; quoted spans up to 500 chars count as
+# dialogue.
+_QUOTE_RE = _re.compile(r'"([^"\n]{1,500})"')
+
+# Pre-materialized, interned name/emotion pools. The generators used to
+# build f"Character {i}" strings inside their loops, allocating a fresh
+# str per segment; indexing into these tuples reuses the same interned
+# objects across every call.
+_NARRATOR = sys.intern("Narrator")
+_CHAR_NAMES = (_NARRATOR,) + tuple(sys.intern(f"Character {i}") for i in range(1, 64))
+_EMOTIONS = tuple(sys.intern(e) for e in ("neutral", "happy", "sad", "angry"))
+
+# Speaker cycle used by the mock dialogue generator: narrator plus the
+# first two named characters.
+_MOCK_SPEAKERS = _CHAR_NAMES[:3]
+
+# Voice-suggestion templates, built once instead of as fresh dict
+# literals per character. The inner dicts are shared; treat them as
+# read-only.
+_NARRATOR_VOICES = (
+    {"voice_id": "narrator_1", "name": "Clear Narrator", "pitch": 0, "speed": 1.0, "confidence": 0.95},
+    {"voice_id": "narrator_2", "name": "Storyteller", "pitch": -1, "speed": 0.9, "confidence": 0.9},
+)
+_MALE_VOICES = (
+    {"voice_id": "male_1", "name": "Standard Male", "pitch": 0, "speed": 1.0, "confidence": 0.9},
+    {"voice_id": "male_2", "name": "Deep Male", "pitch": -2, "speed": 0.95, "confidence": 0.85},
+)
+_FEMALE_VOICES = (
+    {"voice_id": "female_1", "name": "Standard Female", "pitch": 1, "speed": 1.0, "confidence": 0.9},
+    {"voice_id": "female_2", "name": "Soft Female", "pitch": 2, "speed": 1.05, "confidence": 0.85},
+)
+_NEUTRAL_VOICES = (
+    {"voice_id": "neutral_1", "name": "Neutral Voice", "pitch": 0, "speed": 1.0, "confidence": 0.8},
+)
+
+@lru_cache(maxsize=64)
+def _mock_characters_by_length(text_length: int) -> Dict[str, Any]:
+    """
+    Build the mock character analysis for a text of the given length.
+
+    The result depends only on the length, so it is memoized; callers
+    treat the returned payload as read-only, like the other shared mock
+    templates in this module.
+    """
+    num_characters = min(max(2, text_length // 10000), 10)
+
+    # First character is the narrator; the rest are built in one
+    # pre-sized comprehension instead of an append-grown loop.
+    narrator = {
+        "name": _NARRATOR,
+        "description": "The narrator of the story",
+        "dialogue_count": (text_length // 500) * 3,
+        "confidence": 0.9,
+        "is_narrator": True,
+        "character_traits": ["observant", "descriptive"],
+        "gender": None,
+        "age": None,
+        "speaking_style": "formal",
+    }
+    mock_characters = [narrator] + [
+        {
+            "name": _CHAR_NAMES[i],
+            "description": "A supporting character in the story",
+            "dialogue_count": text_length // 500,
+            "confidence": 0.9 - (i * 0.05),
+            "is_narrator": False,
+            "character_traits": ["trait1", "trait2"],
+            "gender": "male" if i % 2 == 0 else "female",
+            "age": "adult",
+            "speaking_style": "casual",
+        }
+        for i in range(1, num_characters)
+    ]
+
+    return {
+        "characters": mock_characters,
+        "language_detected": "en",
+        "character_count": len(mock_characters),
+    }
+
+def mock_character_analysis(text: str) -> Dict[str, Any]:
+    """Generate mock character analysis for testing.
+
+    The output depends only on len(text), so it is memoized by length
+    (typical book chunking asks about same-size chunks repeatedly).
+    """
+    return _mock_characters_by_length(len(text))
+
+def extract_dialogue_segments(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract quoted dialogue spans with the precompiled regex.
+
+    This is the lightweight no-API fallback: one linear scan over the
+    text, attributing speakers round-robin and cycling emotions the same
+    way the synthetic generator does.
+    """
+    return [
+        {
+            "text": m.group(1),
+            "character_name": _MOCK_SPEAKERS[i % 3],
+            "start_index": m.start(1),
+            "end_index": m.end(1),
+            "confidence": 0.8,
+            "emotion": _EMOTIONS[i % 4],
+        }
+        for i, m in enumerate(_QUOTE_RE.finditer(text))
+    ]
+
+def mock_dialogue_analysis(text: str, materialize_text: bool = True) -> Dict[str, Any]:
+    """
+    Generate mock dialogue analysis for testing.
+
+    Texts containing quoted speech get real quote-based extraction via
+    the precompiled regex; quote-free texts fall back to synthetic
+    evenly-spaced segments so the pipeline still has data to exercise.
+
+    With materialize_text=False the synthetic segments carry text=None
+    and only their offsets, skipping one string allocation per segment;
+    callers that need the text recover it via DialogueInfo.text_view.
+    """
+    if '"' in text:
+        extracted = extract_dialogue_segments(text)
+        if extracted:
+            return {
+                "dialogues": extracted,
+                "dialogue_count": len(extracted),
+            }
+
+    # Create some mock dialogue segments
+    text_length = len(text)
+    num_dialogues = min(max(5, text_length // 5000), 50)
+
+    dialogue_length = min(100, text_length // num_dialogues)
+    gap = min(500, text_length // (num_dialogues * 2))
+
+    # The cursor advances by a fixed gap + dialogue_length stride, so
+    # every segment offset is an affine function of its index and the
+    # position arithmetic vectorizes; only the final text slicing
+    # stays in Python.
+    indices = np.arange(num_dialogues, dtype=np.int64)
+    base = indices * (gap + dialogue_length)
+    starts = base + gap
+    mask = (base + dialogue_length < text_length) & (starts < text_length)
+
+    kept = indices[mask]
+    starts = starts[mask]
+    name_indices = kept % 3
+    emotion_indices = kept % 4
+
+    mock_dialogues = [
+        {
+            "text": text[s:s + dialogue_length] if materialize_text else None,
+            "character_name": _MOCK_SPEAKERS[ni],
+            "start_index": s,
+            "end_index": s + dialogue_length,
+            "confidence": 0.8,
+            "emotion": _EMOTIONS[ei],
+        }
+        for s, ni, ei in zip(starts.tolist(), name_indices.tolist(), emotion_indices.tolist())
+    ]
+
+    return {
+        "dialogues": mock_dialogues,
+        "dialogue_count": len(mock_dialogues),
+    }
+
+def mock_voice_suggestions(characters: List[Any]) -> Dict[str, Any]:
+    """Generate mock voice suggestions for testing.
+
+    Accepts either character dicts or CharacterInfo-like objects exposing
+    to_dict(); duck typing keeps this module free of service imports.
+    """
+    voice_suggestions = {}
+
+    # Ensure we're working with character dictionaries
+    char_list = [
+        char if isinstance(char, dict) else char.to_dict()
+        for char in characters
+    ]
+
+    for char in char_list:
+        name = char.get("name", "Unknown")
+        is_narrator = char.get("is_narrator", False)
+        gender = char.get("gender")
+
+        # Pick the appropriate shared template; the list copy keeps
+        # the result JSON-shaped while reusing the suggestion dicts.
+        if is_narrator:
+            suggestions = list(_NARRATOR_VOICES)
+        elif gender == "male":
+            suggestions = list(_MALE_VOICES)
+        elif gender == "female":
+            suggestions = list(_FEMALE_VOICES)
+        else:
+            suggestions = list(_NEUTRAL_VOICES)
+
+        voice_suggestions[name] = suggestions
+
+    return {
+        "voice_suggestions": voice_suggestions,
+    }
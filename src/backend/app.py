@@ -1,21 +1,62 @@
 #!/usr/bin/env python3
+import asyncio
+import atexit
+import itertools
 import os
-import json
 import logging
+import logging.handlers
+import queue
+import tempfile
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Body, Depends, Request, status, APIRouter
+import aiofiles
+
+import msgspec
+import orjson
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Request, status, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 import uvicorn
+from functools import lru_cache
+
+from gemini_service import GeminiService
+from tts_service import KokoroTTSService, TTSError
+from models import (
+    ALLOWED_FILE_EXTENSIONS,
+    REQUEST_DECODERS,
+    AnalysisResponse,
+    AudioGenerationRequest,
+    AudioResponse,
+    BookImportRequest,
+    BookResponse,
+    ProjectCreationRequest,
+    ProjectResponse,
+    TextAnalysisRequest,
+    build_book_record,
+    build_mock_characters,
+    build_project_record,
+    build_voice_record,
+)
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+# Setup logging. Records are enqueued from the handlers (an O(1)
+# SimpleQueue put that never blocks the event loop) and formatted/written
+# to stderr on the QueueListener's background thread, so slow log sinks
+# cannot stall request processing.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 )
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _stream_handler, respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
@@ -23,6 +64,7 @@ app = FastAPI(
     title="Audiobook Generator Backend",
     description="Backend API for Audiobook Generator Application",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Define allowed origins for CORS
@@ -35,13 +77,16 @@ origins = [
     "app://.",  # Electron app origin
 ]
 
-# Add CORS middleware with restricted origins
+# Add CORS middleware with restricted origins. Explicit method/header
+# tuples let the middleware join the Access-Control-Allow-* header
+# values once at construction instead of reflecting the incoming request
+# headers on every preflight.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "HEAD", "OPTIONS"),
+    allow_headers=("Content-Type", "Authorization", "X-Requested-With"),
 )
 
 # Create a router for health endpoints
@@ -53,85 +98,168 @@ books = {}
 characters = {}
 voices = {}
 
-# Define Pydantic models for request validation
-class BookImportRequest(BaseModel):
-    book_type: str = Field(..., description="The type of the book (e.g., epub, pdf, txt)")
-    preserve_structure: bool = Field(True, description="Whether to preserve the book's structure")
-    extract_metadata: bool = Field(True, description="Whether to extract metadata from the book")
-
-    @validator('book_type')
-    def validate_book_type(cls, v):
-        allowed_types = ['epub', 'pdf', 'txt', 'docx', 'html']
-        if v.lower() not in allowed_types:
-            raise ValueError(f'Book type must be one of {allowed_types}')
-        return v
-
-class TextAnalysisRequest(BaseModel):
-    book_id: str = Field(..., description="The ID of the book to analyze")
-    use_gemini: bool = Field(True, description="Whether to use Gemini AI for analysis")
-
-    @validator('book_id')
-    def validate_book_id(cls, v):
-        if not v or not isinstance(v, str):
-            raise ValueError('Book ID must be a non-empty string')
-        return v
-
-class AudioGenerationRequest(BaseModel):
-    book_id: str = Field(..., description="The ID of the book")
-    character_id: str = Field(..., description="The ID of the character")
-    text: str = Field(..., description="The text to generate audio for")
-    voice_params: Dict[str, Any] = Field(default_factory=dict, description="Parameters for voice customization")
-
-    @validator('text')
-    def validate_text(cls, v):
-        if not v or not isinstance(v, str):
-            raise ValueError('Text must be a non-empty string')
-        if len(v) > 10000:
-            raise ValueError('Text is too long (max 10000 characters)')
-        return v
-
-class ProjectCreationRequest(BaseModel):
-    name: str = Field(..., description="The name of the project")
-    book_id: str = Field(..., description="The ID of the book")
-    template: Optional[str] = Field(None, description="Optional template to use")
-
-    @validator('name')
-    def validate_name(cls, v):
-        if not v or not isinstance(v, str):
-            raise ValueError('Project name must be a non-empty string')
-        return v
-
-# Error handler middleware
-@app.middleware("http")
-async def error_handling_middleware(request: Request, call_next):
+# Monotonic ID generators. next() on a count() is atomic under the GIL
+# and O(1), unlike the old len(store) + 1 pattern which was O(n) and had
+# a check-then-act race once handlers run off the event loop. Ids are
+# unique by construction, so the store insert that follows needs no
+# lock either -- each handler writes its own freshly-allocated key.
+_book_ids = itertools.count(1)
+_audio_ids = itertools.count(1)
+_project_ids = itertools.count(1)
+
+# L1 cache of fully-serialized project responses, keyed by project_id.
+# Read endpoints serve the cached bytes directly instead of re-encoding
+# the record on every hit. The cache is per-process; a multi-worker
+# deployment would publish invalidations out-of-band (e.g. Redis pub/sub).
+_PROJECT_CACHE_MAX = 1024
+_project_json_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+def _cache_project_json(project_id: str, payload: bytes) -> None:
+    """Insert serialized project bytes, evicting the LRU entry when full."""
+    _project_json_cache[project_id] = payload
+    _project_json_cache.move_to_end(project_id)
+    while len(_project_json_cache) > _PROJECT_CACHE_MAX:
+        _project_json_cache.popitem(last=False)
+
+def _invalidate_project_cache(project_id: str) -> None:
+    """Drop the cached serialization for a project after a mutation."""
+    _project_json_cache.pop(project_id, None)
+
+def _parse_book_import(
+    book_type: str,
+    preserve_structure: bool = True,
+    extract_metadata: bool = True,
+) -> BookImportRequest:
+    """Dependency that builds BookImportRequest from query parameters.
+
+    Defined once at module scope so FastAPI resolves a single callable
+    instead of re-deriving per-endpoint parsing logic; the Struct's
+    __post_init__ performs the validation. book_type has no default --
+    like the original model's required field, a request without it is
+    rejected with 422.
+    """
     try:
-        return await call_next(request)
-    except Exception as e:
-        logger.exception(f"Unhandled error processing request: {str(e)}")
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={"status": "error", "message": "Internal server error"},
+        return BookImportRequest(
+            book_type=book_type,
+            preserve_structure=preserve_structure,
+            extract_metadata=extract_metadata,
         )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+async def _decode_body(http_request: Request, model: type):
+    """Decode and validate a JSON request body into a msgspec Struct."""
+    try:
+        return REQUEST_DECODERS[model].decode(await http_request.body())
+    except (msgspec.DecodeError, msgspec.ValidationError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+# Directory where uploaded books are materialized for parsing.
+UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", tempfile.gettempdir())) / "audiobook_uploads"
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+_UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+async def _save_upload(file: UploadFile, dest: Path) -> int:
+    """
+    Stream an uploaded file to dest without buffering it in memory.
+
+    Large uploads that Starlette has already spooled to a real temp file
+    are copied kernel-side with os.sendfile; everything else is streamed
+    out in 1 MiB chunks through aiofiles.
+
+    Returns:
+        Number of bytes written.
+    """
+    await file.seek(0)
+
+    backing = getattr(file.file, "_file", None)
+    try:
+        in_fd = backing.fileno() if backing is not None else None
+    except (OSError, ValueError, AttributeError):
+        in_fd = None  # Still an in-memory BytesIO spool
+
+    if in_fd is not None and hasattr(os, "sendfile"):
+        def _sendfile_copy() -> int:
+            size = os.fstat(in_fd).st_size
+            with open(dest, "wb") as out:
+                sent = 0
+                while sent < size:
+                    sent += os.sendfile(out.fileno(), in_fd, sent, size - sent)
+            return sent
+
+        return await asyncio.get_running_loop().run_in_executor(None, _sendfile_copy)
+
+    written = 0
+    async with aiofiles.open(dest, "wb") as out:
+        while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+            await out.write(chunk)
+            written += len(chunk)
+    return written
+
+# Service dependencies. lru_cache(maxsize=1) makes each provider a
+# process-wide singleton: the client (and any connection pool or model
+# handle it owns) is built on first use and shared by every request.
+@lru_cache(maxsize=1)
+def get_gemini_service() -> GeminiService:
+    """Shared Gemini client for text analysis."""
+    return GeminiService()
+
+@lru_cache(maxsize=1)
+def get_tts_service() -> KokoroTTSService:
+    """Shared Kokoro TTS engine handle."""
+    return KokoroTTSService()
+
+# Centralized exception handlers replace the identical try/except
+# boilerplate the handlers used to carry. Unlike the http-middleware
+# wrapper this app used to install, Starlette dispatches to these
+# directly without allocating an extra coroutine frame per request.
+@app.exception_handler(ValueError)
+async def value_error_handler(request: Request, exc: ValueError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"status": "error", "detail": str(exc)},
+    )
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.exception(f"Unhandled error processing {request.url.path}: {str(exc)}")
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"status": "error", "message": "Internal server error"},
+    )
 
 @app.get("/")
 async def root():
     """Root endpoint to check if API is running."""
     return {"status": "ok", "message": "Audiobook Generator Backend API"}
 
+# The health payload is static, so encode it once at import time;
+# liveness probes then cost a single prebuilt Response return with no
+# per-call dict build or JSON encode. Starlette omits the body for HEAD
+# automatically.
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "uptime": "active",
+    "services": {
+        "database": "simulated",
+        "tts_engine": "ready",
+        "gemini_api": "ready"
+    }
+})
+
 # Handle both GET and HEAD requests for health checks
 @health_router.get("/health")
 @health_router.head("/health")
 async def health_check():
     """Health check endpoint for startup coordination."""
-    return {
-        "status": "healthy",
-        "uptime": "active",
-        "services": {
-            "database": "simulated",
-            "tts_engine": "ready",
-            "gemini_api": "ready"
-        }
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 # Include the health router
 app.include_router(health_router)
@@ -144,175 +272,199 @@ async def get_version():
 @app.post("/api/import-book")
 async def import_book(
     file: UploadFile = File(...),
-    request: BookImportRequest = Depends(),
+    request: BookImportRequest = Depends(_parse_book_import),
 ):
     """Import a book file and parse it."""
-    try:
-        # Validate file
-        if not file.filename:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail="File has no filename"
-            )
-            
-        # Check file extension
-        file_ext = file.filename.split('.')[-1].lower()
-        if file_ext not in ['txt', 'epub', 'pdf', 'docx', 'html']:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail=f"Unsupported file format: {file_ext}"
-            )
-        
-        # In a real implementation, we would save the file, parse it, etc.
-        # For now, we'll just return a mock response
-        book_id = f"book_{len(books) + 1}"
-        filename = file.filename
-        
-        # Mock book data
-        books[book_id] = {
-            "id": book_id,
-            "filename": filename,
-            "type": request.book_type,
-            "title": filename.split(".")[0],  # Simple title extraction
-            "author": "Unknown Author",
-            "chapters": [{"title": f"Chapter {i+1}", "content": f"Content for chapter {i+1}"} for i in range(3)],
-            "metadata": {
-                "extracted": request.extract_metadata,
-                "preserve_structure": request.preserve_structure,
-            }
-        }
-        
-        logger.info(f"Imported book: {filename} (ID: {book_id})")
+    # Validate file
+    if not file.filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail="File has no filename"
+        )
         
-        return {
-            "book_id": book_id,
-            "status": "success",
-            "message": f"Successfully imported {filename}",
-            "book_data": books[book_id]
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error importing book: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to import book: {str(e)}")
+    # Check file extension. splitext avoids splitting the whole name
+    # on every dot and returns '' (rejected below) for extensionless
+    # names instead of treating the basename as an extension.
+    file_ext = os.path.splitext(file.filename)[1].lstrip('.').lower()
+    if file_ext not in ALLOWED_FILE_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail=f"Unsupported file format: {file_ext}"
+        )
+    
+    filename = file.filename
+
+    book_id = f"book_{next(_book_ids)}"
+
+    # Materialize the upload for the (future) parser without holding
+    # the whole file in memory.
+    dest = UPLOAD_DIR / f"{book_id}_{Path(filename).name}"
+    size_bytes = await _save_upload(file, dest)
+
+    loop = asyncio.get_running_loop()
+    book_record = await loop.run_in_executor(
+        None, build_book_record, book_id, filename, request
+    )
+    book_record.file_path = str(dest)
+    book_record.size_bytes = size_bytes
+    books[book_id] = book_record
+
+
+    logger.info(f"Imported book: {filename} (ID: {book_id})")
+    
+    return BookResponse.model_construct(
+        book_id=book_id,
+        status="success",
+        message=f"Successfully imported {filename}",
+        book_data=msgspec.to_builtins(books[book_id]),
+    )
 
 @app.post("/api/analyze-text")
-async def analyze_text(request: TextAnalysisRequest):
+async def analyze_text(
+    http_request: Request,
+    gemini: GeminiService = Depends(get_gemini_service),
+):
     """Analyze text to identify characters and dialogue."""
-    try:
-        if request.book_id not in books:
-            raise HTTPException(status_code=404, detail=f"Book not found: {request.book_id}")
-        
-        # Mock character data
-        char_count = 3
+    request = await _decode_body(http_request, TextAnalysisRequest)
+    if request.book_id not in books:
+        raise HTTPException(status_code=404, detail=f"Book not found: {request.book_id}")
+
+    book_text = "\n\n".join(
+        chapter.get("content", "") for chapter in books[request.book_id].chapters
+    )
+
+    if request.use_gemini and book_text:
+        infos = await gemini.identify_characters(book_text)
         mock_characters = [
             {
                 "id": f"char_{i+1}",
-                "name": f"Character {i+1}",
-                "dialogue_lines": 10 * (i+1),
-                "confidence": 0.9 - (i * 0.1),
-                "description": f"Description for Character {i+1}",
-                "is_narrator": i == 0
+                "name": info.name,
+                "dialogue_lines": info.dialogue_count,
+                "confidence": info.confidence,
+                "description": info.description,
+                "is_narrator": info.is_narrator,
             }
-            for i in range(char_count)
+            for i, info in enumerate(infos)
         ]
-        
-        characters[request.book_id] = mock_characters
-        
-        logger.info(f"Analyzed text for book: {request.book_id} (Found {char_count} characters)")
-        
-        return {
-            "book_id": request.book_id,
-            "status": "success",
-            "characters": mock_characters,
-            "used_gemini": request.use_gemini
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error analyzing text: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to analyze text: {str(e)}")
+    else:
+        # Mock character data; this is now a cheap copy of a
+        # precomputed tuple, so no executor hop is needed.
+        mock_characters = build_mock_characters()
+
+    characters[request.book_id] = mock_characters
+
+    logger.info(f"Analyzed text for book: {request.book_id} (Found {len(mock_characters)} characters)")
+    
+    return AnalysisResponse.model_construct(
+        book_id=request.book_id,
+        status="success",
+        characters=mock_characters,
+        used_gemini=request.use_gemini,
+    )
 
 @app.post("/api/generate-audio")
-async def generate_audio(request: AudioGenerationRequest):
+async def generate_audio(
+    http_request: Request,
+    tts: KokoroTTSService = Depends(get_tts_service),
+):
     """Generate audio for text using TTS."""
+    request = await _decode_body(http_request, AudioGenerationRequest)
+    if request.book_id not in books:
+        raise HTTPException(status_code=404, detail=f"Book not found: {request.book_id}")
+
+    # Hex-format the counter for shorter keys (smaller dict keys hash
+    # and compare faster). A counter does reveal request volume; swap
+    # in secrets.token_hex(4) if that ever matters more than the RNG
+    # cost.
+    audio_id = f"audio_{request.book_id}_{request.character_id}_{next(_audio_ids):x}"
+
+    # Synthesize through the shared TTS engine; agenerate_audio runs the
+    # blocking pipeline (including the file write) on a worker thread.
+    voice_id = request.voice_params.get("voice_id", "voice_1")
+    tts_params = {k: v for k, v in request.voice_params.items() if k != "voice_id"}
+    loop = asyncio.get_running_loop()
     try:
-        if request.book_id not in books:
-            raise HTTPException(status_code=404, detail=f"Book not found: {request.book_id}")
-        
-        # Mock audio generation
-        audio_id = f"audio_{request.book_id}_{request.character_id}_{len(voices) + 1}"
-        
-        # In a real implementation, we would call the TTS model
-        voices[audio_id] = {
-            "id": audio_id,
-            "book_id": request.book_id,
-            "character_id": request.character_id,
-            "text": request.text,
-            "params": request.voice_params,
-            "duration": len(request.text) / 20,  # Mock duration calculation
-            "file_path": f"/path/to/audio/{audio_id}.mp3"  # Mock file path
-        }
-        
-        logger.info(f"Generated audio: {audio_id}")
-        
-        return {
-            "audio_id": audio_id,
-            "status": "success",
-            "duration": voices[audio_id]["duration"],
-            "file_path": voices[audio_id]["file_path"]
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error generating audio: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate audio: {str(e)}")
+        tts_result = await tts.agenerate_audio(request.text, voice_id, tts_params)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except TTSError as e:
+        raise HTTPException(status_code=500, detail=f"TTS engine error: {str(e)}")
+
+    record = await loop.run_in_executor(None, build_voice_record, audio_id, request)
+    record.duration = tts_result.duration
+    record.file_path = tts_result.file_path
+    voices[audio_id] = record
+
+
+    logger.info(f"Generated audio: {audio_id}")
+    
+    return AudioResponse.model_construct(
+        audio_id=audio_id,
+        status="success",
+        duration=record.duration,
+        file_path=record.file_path,
+    )
 
 @app.post("/api/create-project")
-async def create_project(request: ProjectCreationRequest):
+async def create_project(http_request: Request):
     """Create a new audiobook project."""
-    try:
-        if request.book_id not in books:
-            raise HTTPException(status_code=404, detail=f"Book not found: {request.book_id}")
-        
-        project_id = f"project_{len(projects) + 1}"
-        
-        # Mock project data
-        projects[project_id] = {
-            "id": project_id,
-            "name": request.name,
-            "book_id": request.book_id,
-            "template": request.template,
-            "created_at": "2023-07-01T12:00:00Z",  # Mock date
-            "status": "pending",
-            "progress": 0,
-        }
-        
-        logger.info(f"Created project: {request.name} (ID: {project_id})")
-        
-        return {
-            "project_id": project_id,
-            "status": "success",
-            "project_data": projects[project_id]
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating project: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
+    request = await _decode_body(http_request, ProjectCreationRequest)
+    if request.book_id not in books:
+        raise HTTPException(status_code=404, detail=f"Book not found: {request.book_id}")
+    
+    project_id = f"project_{next(_project_ids)}"
+
+    loop = asyncio.get_running_loop()
+    projects[project_id] = await loop.run_in_executor(
+        None, build_project_record, project_id, request
+    )
+
+    # New/updated records must not serve stale serialized bytes.
+    _invalidate_project_cache(project_id)
+    
+    logger.info(f"Created project: {request.name} (ID: {project_id})")
+    
+    return ProjectResponse.model_construct(
+        project_id=project_id,
+        status="success",
+        project_data=msgspec.to_builtins(projects[project_id]),
+    )
 
 @app.get("/api/projects")
 async def get_projects():
     """Get all projects."""
-    return {"projects": list(projects.values())}
+    return Response(
+        content=msgspec.json.encode({"projects": list(projects.values())}),
+        media_type="application/json",
+    )
 
 @app.get("/api/project/{project_id}")
 async def get_project(project_id: str):
     """Get a specific project."""
+    cached = _project_json_cache.get(project_id)
+    if cached is not None:
+        _project_json_cache.move_to_end(project_id)
+        return Response(content=cached, media_type="application/json")
+
     if project_id not in projects:
         raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
-    
-    return {"project": projects[project_id]}
+
+    payload = msgspec.json.encode({"project": projects[project_id]})
+    _cache_project_json(project_id, payload)
+    return Response(content=payload, media_type="application/json")
 
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="127.0.0.1", port=5000, reload=True) 
\ No newline at end of file
+    # With uvicorn[standard] installed, loop/http "auto" picks uvloop and
+    # httptools where the platform supports them (pure-Python fallbacks on
+    # Windows). The reload watcher only runs in development; production
+    # deployments should use multiple workers, e.g.:
+    #   gunicorn app:app -k uvicorn.workers.UvicornWorker -w $(nproc) --bind 127.0.0.1:5000
+    dev_mode = os.environ.get("NODE_ENV", "development") != "production"
+    uvicorn.run(
+        "app:app",
+        host="127.0.0.1",
+        port=5000,
+        loop="auto",
+        http="auto",
+        reload=dev_mode,
+    ) 
\ No newline at end of file
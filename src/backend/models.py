@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Request/response models and pure record builders for the backend API.
+
+This module deliberately avoids FastAPI imports and import-time side
+effects so it stays compilable as a unit (e.g. with mypyc) independently
+of the decorated route handlers in app.py.
+"""
+from typing import Any, Dict, List, Optional
+
+import msgspec
+from pydantic import BaseModel, ConfigDict
+
+# Accepted book formats, precomputed once. frozenset membership checks
+# beat rebuilding a list literal on every request/validation call.
+ALLOWED_BOOK_TYPES = frozenset({'epub', 'pdf', 'txt', 'docx', 'html'})
+ALLOWED_FILE_EXTENSIONS = frozenset({'txt', 'epub', 'pdf', 'docx', 'html'})
+_ALLOWED_BOOK_TYPES_MSG = sorted(ALLOWED_BOOK_TYPES)
+
+# Define msgspec models for request validation.
+# Structs are frozen so instances can be shared safely; field-level checks
+# that Pydantic ran in @validator methods live in __post_init__ instead.
+class BookImportRequest(msgspec.Struct, frozen=True):
+    """Options for importing a book (e.g., epub, pdf, txt)."""
+    book_type: str
+    preserve_structure: bool = True
+    extract_metadata: bool = True
+
+    def __post_init__(self):
+        if self.book_type.lower() not in ALLOWED_BOOK_TYPES:
+            raise ValueError(f'Book type must be one of {_ALLOWED_BOOK_TYPES_MSG}')
+        msgspec.structs.force_setattr(self, 'book_type', self.book_type.lower())
+
+class TextAnalysisRequest(msgspec.Struct, frozen=True):
+    """Request to analyze a book's text for characters and dialogue."""
+    book_id: str
+    use_gemini: bool = True
+
+    def __post_init__(self):
+        if not self.book_id:
+            raise ValueError('Book ID must be a non-empty string')
+
+class AudioGenerationRequest(msgspec.Struct, frozen=True):
+    """Request to generate audio for a piece of text."""
+    book_id: str
+    character_id: str
+    text: str
+    voice_params: Dict[str, Any] = msgspec.field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.text:
+            raise ValueError('Text must be a non-empty string')
+        if len(self.text) > 10000:
+            raise ValueError('Text is too long (max 10000 characters)')
+
+class ProjectCreationRequest(msgspec.Struct, frozen=True):
+    """Request to create a new audiobook project."""
+    name: str
+    book_id: str
+    template: Optional[str] = None
+
+    def __post_init__(self):
+        if not self.name:
+            raise ValueError('Project name must be a non-empty string')
+
+# Pre-built JSON decoders, one per request model. Building a Decoder is
+# relatively expensive, so we do it once at import time and reuse it for
+# every request instead of paying the cost per call.
+REQUEST_DECODERS = {
+    model: msgspec.json.Decoder(model)
+    for model in (TextAnalysisRequest, AudioGenerationRequest, ProjectCreationRequest)
+}
+
+# Response models. These are only ever built from data this process
+# produced itself, so endpoints instantiate them with model_construct()
+# to skip schema validation entirely. Never feed request input through
+# model_construct -- untrusted data must go through normal validation.
+# frozen + revalidate_instances="never" lets instances pass through the
+# dependency graph by reference instead of being defensively copied or
+# re-validated.
+class BookResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, revalidate_instances="never")
+
+    book_id: str
+    status: str
+    message: str
+    book_data: Dict[str, Any]
+
+class AnalysisResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, revalidate_instances="never")
+
+    book_id: str
+    status: str
+    characters: List[Dict[str, Any]]
+    used_gemini: bool
+
+class AudioResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, revalidate_instances="never")
+
+    audio_id: str
+    status: str
+    duration: float
+    file_path: str
+
+class ProjectResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, revalidate_instances="never")
+
+    project_id: str
+    status: str
+    project_data: Dict[str, Any]
+
+# In-memory record types. Struct instances carry no per-instance
+# __dict__, shrinking each stored record several-fold versus a plain
+# dict and turning field access into a fixed-offset load. They serialize
+# directly through msgspec.json.encode / msgspec.to_builtins at the
+# response boundary.
+class BookRecord(msgspec.Struct):
+    id: str
+    filename: str
+    type: str
+    title: str
+    author: str
+    chapters: List[Dict[str, Any]]
+    metadata: Dict[str, Any]
+    file_path: Optional[str] = None
+    size_bytes: int = 0
+
+class VoiceRecord(msgspec.Struct):
+    id: str
+    book_id: str
+    character_id: str
+    text: str
+    params: Dict[str, Any]
+    duration: float
+    file_path: str
+
+class ProjectRecord(msgspec.Struct):
+    id: str
+    name: str
+    book_id: str
+    template: Optional[str]
+    created_at: str
+    status: str
+    progress: int
+
+# Pure record builders. The handlers are async for I/O (body reads,
+# store locks) but the record construction itself is plain CPU work, so
+# it is factored out here and dispatched to the default executor. Once
+# real parsing/TTS replaces these mocks, the heavy lifting stays off the
+# event loop.
+def build_book_record(book_id: str, filename: str, request: BookImportRequest) -> BookRecord:
+    """Build the stored record for an imported book."""
+    return BookRecord(
+        id=book_id,
+        filename=filename,
+        type=request.book_type,
+        title=filename.split(".")[0],  # Simple title extraction
+        author="Unknown Author",
+        chapters=[{"title": f"Chapter {i+1}", "content": f"Content for chapter {i+1}"} for i in range(3)],
+        metadata={
+            "extracted": request.extract_metadata,
+            "preserve_structure": request.preserve_structure,
+        },
+    )
+
+def _make_mock_characters(char_count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"char_{i+1}",
+            "name": f"Character {i+1}",
+            "dialogue_lines": 10 * (i+1),
+            "confidence": 0.9 - (i * 0.1),
+            "description": f"Description for Character {i+1}",
+            "is_narrator": i == 0
+        }
+        for i in range(char_count)
+    ]
+
+# The default mock character list is constant data, so it is built once
+# at import time; callers treat the entries as read-only.
+_MOCK_CHARACTERS = tuple(_make_mock_characters(3))
+
+def build_mock_characters(char_count: int = 3) -> List[Dict[str, Any]]:
+    """Build the mock character list returned by analyze_text."""
+    if char_count == len(_MOCK_CHARACTERS):
+        return list(_MOCK_CHARACTERS)
+    return _make_mock_characters(char_count)
+
+def build_voice_record(audio_id: str, request: AudioGenerationRequest) -> VoiceRecord:
+    """Build the stored record for a generated audio clip."""
+    return VoiceRecord(
+        id=audio_id,
+        book_id=request.book_id,
+        character_id=request.character_id,
+        text=request.text,
+        params=request.voice_params,
+        duration=len(request.text) / 20,  # Mock duration calculation
+        file_path=f"/path/to/audio/{audio_id}.mp3",  # Mock file path
+    )
+
+def build_project_record(project_id: str, request: ProjectCreationRequest) -> ProjectRecord:
+    """Build the stored record for a new project."""
+    return ProjectRecord(
+        id=project_id,
+        name=request.name,
+        book_id=request.book_id,
+        template=request.template,
+        created_at="2023-07-01T12:00:00Z",  # Mock date
+        status="pending",
+        progress=0,
+    )
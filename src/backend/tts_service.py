@@ -1,17 +1,228 @@
 #!/usr/bin/env python3
 import os
+import re
+import queue
+import asyncio
+import hashlib
 import logging
 import tempfile
+import threading
+import itertools
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple, List, Union
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+import msgspec
+import numpy as np
+import orjson
+
+# Logging configuration (handlers, formatting) belongs to the embedding
+# app -- app.py installs the queue-based root handler before serving.
 logger = logging.getLogger(__name__)
 
+# Parameter validation tables, built once at import. frozenset
+# membership is a hash lookup instead of an O(n) list scan, and the
+# default template is copied instead of being rebuilt branch by branch.
+_VALID_EMOTIONS = frozenset(("neutral", "happy", "sad", "angry"))
+_DEFAULT_PROCESSED = {"pitch": 0.0, "speed": 1.0, "emotion": "neutral", "emphasis": ()}
+
+# Token pattern for word counting, compiled once.
+_WORD_RE = re.compile(r"\S+")
+
+# Internal whitespace runs collapsed by text normalization.
+_WS_RE = re.compile(r"\s+")
+
+# Digest used for content-addressed cache keys and file names. xxh3 is
+# SIMD-accelerated and several times faster than blake2b on long texts;
+# both yield deterministic, cross-process-stable 32-hex-char names, so
+# the stdlib fallback only costs speed.
+try:
+    from xxhash import xxh3_128_hexdigest as _payload_digest
+except ImportError:
+    def _payload_digest(payload: bytes) -> str:
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+# Assumed speaking rate in words per minute, shared by the scalar
+# estimate in generate_audio and the vectorized helper below.
+_WPM = np.float32(150.0)
+
+def estimate_durations(word_counts: np.ndarray, speeds: np.ndarray) -> np.ndarray:
+    """
+    Estimate audio durations for a batch of texts.
+
+    Vectorized form of the per-call (words / 150) / speed estimate in
+    generate_audio: batch pipelines that pre-count words per chunk (see
+    _count_words) get one NumPy division over the whole array instead
+    of N Python-level divisions. Single calls keep the scalar path.
+
+    Args:
+        word_counts: Word count per text chunk
+        speeds: Speed parameter per chunk (broadcastable scalar is fine)
+
+    Returns:
+        float32 array of estimated durations, matching the scalar
+        estimate in generate_audio element for element
+    """
+    return (word_counts.astype(np.float32) / _WPM) / speeds
+
+def _count_words(text: str) -> int:
+    """Count whitespace-separated words without materializing a list.
+
+    text.split() allocates a str per token (thousands for a 10k-char
+    input) just to take len(); iterating the match objects counts the
+    same tokens with constant memory.
+    """
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+# Spec table driving parameter validation: accepted types, the phrase
+# used in type-error messages, an inclusive (low, high) range for
+# numeric values and an allowed-value set for enumerated ones. Adding a
+# parameter means adding a row here and a default in _DEFAULT_PROCESSED
+# rather than growing the validator. Emphasis accepts a tuple so the
+# memoized path can pass a hashable canonical form.
+_PARAM_SPECS: Dict[str, Tuple[Any, str, Optional[Tuple[float, float]], Optional[frozenset]]] = {
+    "pitch": ((int, float), "a number", (-10.0, 10.0), None),
+    "speed": ((int, float), "a number", (0.5, 2.0), None),
+    "emotion": (str, "a string", None, _VALID_EMOTIONS),
+    "emphasis": ((list, tuple), "a list of words", None, None),
+}
+
+def _validate_one(name: str, value: Any, spec: Tuple[Any, str, Optional[Tuple[float, float]], Optional[frozenset]]) -> Any:
+    """Validate a single parameter value against its spec row."""
+    types, type_desc, bounds, choices = spec
+    if not isinstance(value, types):
+        raise ValueError(f"{name.capitalize()} must be {type_desc}")
+    if bounds is not None:
+        low, high = bounds
+        if value < low or value > high:
+            raise ValueError(f"{name.capitalize()} must be between {low} and {high}")
+    if choices is not None and value not in choices:
+        raise ValueError(f"{name.capitalize()} must be one of: {sorted(choices)}")
+    return value
+
+def _validate_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate voice parameters and apply defaults.
+
+    One pass over the spec table instead of a per-parameter if/else
+    chain; keys present in params are validated, missing ones take their
+    template default.
+
+    Args:
+        params: The parameters to process
+
+    Returns:
+        Processed parameters with defaults applied
+
+    Raises:
+        ValueError: If any parameter is invalid
+    """
+    processed = {
+        name: _validate_one(name, params[name], spec) if name in params else _DEFAULT_PROCESSED[name]
+        for name, spec in _PARAM_SPECS.items()
+    }
+
+    # The template stores emphasis as an immutable tuple; hand callers a
+    # fresh list either way.
+    processed["emphasis"] = list(processed["emphasis"])
+    return processed
+
+@lru_cache(maxsize=256)
+def _process_params_cached(items: Tuple[Tuple[str, Any], ...]) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Memoized form of _validate_params over a canonical items tuple.
+
+    Real callers reuse a small set of parameter dicts, so the full
+    isinstance/range chain runs once per distinct shape and subsequent
+    calls are a cache hit. Values are returned as a tuple of pairs (with
+    emphasis as a tuple) so the cached value itself stays immutable.
+    """
+    processed = _validate_params(dict(items))
+    processed["emphasis"] = tuple(processed["emphasis"])
+    return tuple(processed.items())
+
+class _AudioBufferPool:
+    """
+    Reusable pool of float32 PCM sample buffers for the synthesis model.
+
+    Each real synthesis call needs a samples array (24 kHz * duration)
+    that would otherwise be malloc'd and freed per call; on long
+    audiobook jobs that churn fragments the allocator and inflates peak
+    RSS. Buffers are bucketed by power-of-two capacity and recycled
+    LIFO, so the most recently used (cache-warm) buffer is handed out
+    first. Nothing is preallocated: buckets fill as buffers are
+    released, up to a per-bucket cap.
+    """
+
+    # Smallest bucket: one second of audio at 24 kHz, rounded up.
+    _MIN_BUCKET = 1 << 15
+
+    def __init__(self, max_per_bucket: Optional[int] = None):
+        if max_per_bucket is None:
+            max_per_bucket = int(os.environ.get("KOKORO_AUDIO_POOL_SIZE", "8"))
+        self._max_per_bucket = max_per_bucket
+        self._buckets: Dict[int, "queue.LifoQueue[np.ndarray]"] = {}
+        self._buckets_lock = threading.Lock()
+
+    def _bucket_for(self, n: int) -> Tuple[int, "queue.LifoQueue[np.ndarray]"]:
+        capacity = self._MIN_BUCKET
+        while capacity < n:
+            capacity <<= 1
+        bucket = self._buckets.get(capacity)
+        if bucket is None:
+            with self._buckets_lock:
+                bucket = self._buckets.setdefault(
+                    capacity, queue.LifoQueue(maxsize=self._max_per_bucket)
+                )
+        return capacity, bucket
+
+    def acquire(self, n: int) -> np.ndarray:
+        """Return an uninitialized float32 view of exactly n samples.
+
+        The view is sliced from a pooled backing buffer of the next
+        power-of-two capacity; pass it back to release() when the
+        encoded audio has been written out.
+        """
+        capacity, bucket = self._bucket_for(n)
+        try:
+            backing = bucket.get_nowait()
+        except queue.Empty:
+            backing = np.empty(capacity, dtype=np.float32)
+        return backing[:n]
+
+    def release(self, buf: np.ndarray) -> None:
+        """Recycle a buffer obtained from acquire(); drops it if the
+        bucket is already full."""
+        backing = buf.base if buf.base is not None else buf
+        bucket = self._buckets.get(backing.shape[0])
+        if bucket is None:
+            return
+        try:
+            bucket.put_nowait(backing)
+        except queue.Full:
+            pass
+
+class TTSResult(msgspec.Struct):
+    """Result of one synthesis call.
+
+    A msgspec Struct instead of a 7-key dict: C-allocated, no
+    per-instance dict, fixed-offset field access. to_dict() restores the
+    dict shape for callers that serialize the result.
+    """
+    file_path: str
+    duration: float
+    format: str = "mp3"
+    sample_rate: int = 24000
+    text_length: int = 0
+    voice_id: str = ""
+    parameters: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation."""
+        return msgspec.to_builtins(self)
+
 class TTSError(Exception):
     """Base exception for TTS service errors."""
     pass
@@ -26,7 +237,14 @@ class TTSProcessingError(TTSError):
 
 class KokoroTTSService:
     """Service for interacting with Kokoro TTS system."""
-    
+
+    # Output path prefix for generated audio, resolved once at class
+    # creation; tempfile.gettempdir() walks env vars and stats
+    # directories on first call and is not worth repeating per request.
+    # Precomputing the whole prefix leaves one f-string concatenation
+    # per file name on the hot path.
+    _TMP_PREFIX = os.path.join(tempfile.gettempdir(), "kokoro_tts_")
+
     def __init__(self, model_path: Optional[str] = None):
         """
         Initialize the Kokoro TTS service.
@@ -38,14 +256,43 @@ class KokoroTTSService:
         self.initialized = False
         self.available_voices = []
         self.model = None
-        
-        # Validate model path
-        model_dir = Path(self.model_path)
-        if not model_dir.exists():
-            logger.warning(f"Model directory not found: {self.model_path}")
-            # We'll initialize lazily when needed
-        else:
-            self._load_model()
+
+        self._voices_by_id: Dict[str, Dict[str, Any]] = {}
+
+        # Snapshot of the known voice ids for error messages; rebuilt
+        # only when the voice set changes, so the unknown-voice error
+        # path allocates nothing beyond the message itself.
+        self._available_ids: List[str] = []
+
+        # Serializes first-use model loading; reentrant so a loader that
+        # calls back into ensure_model_loaded cannot deadlock.
+        self._load_lock = threading.RLock()
+
+        # Guards custom-voice registration. Id allocation and the
+        # list/index updates must be atomic or concurrent customize_voice
+        # calls can mint duplicate ids.
+        self._voice_lock = threading.Lock()
+        self._voice_counter = itertools.count(1)
+
+        # Content-addressed cache of generated audio, keyed by a stable
+        # digest of (text, voice_id, processed params). Repeat synthesis
+        # of the same inputs becomes a dict lookup plus a stat instead of
+        # model work.
+        self._audio_cache: "OrderedDict[str, TTSResult]" = OrderedDict()
+        self._audio_cache_max = 256
+
+        # Sample-buffer pool for the real synthesis backend; buckets
+        # fill lazily, so constructing it here costs nothing for the
+        # mock path.
+        self._pool = _AudioBufferPool()
+
+        # Validate model path, statting it once. The model itself loads
+        # lazily on first use (ensure_model_loaded), so constructing the
+        # service is cheap: importers, test collectors and pre-fork
+        # workers don't pay the load cost up front.
+        self._model_dir_exists = os.path.isdir(self.model_path)
+        if not self._model_dir_exists:
+            logger.warning("Model directory not found: %s", self.model_path)
     
     def _load_model(self) -> None:
         """
@@ -55,7 +302,7 @@ class KokoroTTSService:
             TTSModelNotFoundError: If the model cannot be loaded.
         """
         try:
-            logger.info(f"Loading Kokoro TTS model from {self.model_path}...")
+            logger.info("Loading Kokoro TTS model from %s...", self.model_path)
             # In a real implementation, we would actually load the model here
             # self.model = KokoroTTS.load_model(self.model_path)
             
@@ -67,10 +314,15 @@ class KokoroTTSService:
                 {"id": "voice_3", "name": "Female 2", "gender": "female", "language": "en-US"},
                 {"id": "voice_4", "name": "Male 2", "gender": "male", "language": "en-US"},
             ]
+            # Parallel id index so voice validation/lookup is one
+            # dict.get instead of scanning the list per request.
+            self._voices_by_id = {v["id"]: v for v in self.available_voices}
+            self._available_ids = list(self._voices_by_id)
+            self._voice_counter = itertools.count(len(self.available_voices) + 1)
             self.initialized = True
             logger.info("Kokoro TTS model loaded successfully.")
         except Exception as e:
-            logger.error(f"Failed to load Kokoro TTS model: {str(e)}")
+            logger.error("Failed to load Kokoro TTS model: %s", e)
             raise TTSModelNotFoundError(f"Failed to load Kokoro TTS model: {str(e)}")
     
     def ensure_model_loaded(self) -> None:
@@ -81,16 +333,20 @@ class KokoroTTSService:
             TTSModelNotFoundError: If the model cannot be loaded.
         """
         if not self.initialized:
-            self._load_model()
-            if not self.initialized:
-                raise TTSModelNotFoundError("TTS model could not be initialized")
+            with self._load_lock:
+                # Double-checked: another thread may have loaded while
+                # this one waited on the lock.
+                if not self.initialized:
+                    self._load_model()
+                    if not self.initialized:
+                        raise TTSModelNotFoundError("TTS model could not be initialized")
     
     def generate_audio(
         self, 
         text: str, 
         voice_id: str, 
         params: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    ) -> TTSResult:
         """
         Generate audio from text using Kokoro TTS.
         
@@ -104,7 +360,7 @@ class KokoroTTSService:
                 - emphasis: Words to emphasize (list of words)
                 
         Returns:
-            Dict containing:
+            TTSResult with:
                 - file_path: Path to the generated audio file
                 - duration: Duration of the audio in seconds
                 - format: Audio format (e.g., "mp3", "wav")
@@ -131,112 +387,223 @@ class KokoroTTSService:
         try:
             self.ensure_model_loaded()
         except TTSModelNotFoundError as e:
-            logger.error(f"Model not loaded: {str(e)}")
+            logger.error("Model not loaded: %s", e)
             raise
         
         # Check if the voice exists
-        voice_exists = any(voice["id"] == voice_id for voice in self.available_voices)
-        if not voice_exists:
-            available_ids = [voice["id"] for voice in self.available_voices]
-            raise ValueError(f"Voice ID '{voice_id}' not found. Available voices: {available_ids}")
-        
+        if voice_id not in self._voices_by_id:
+            raise ValueError(f"Voice ID '{voice_id}' not found. Available voices: {self._available_ids}")
+
         try:
-            logger.info(f"Generating audio for text of length {len(text)} with voice {voice_id}")
-            
+            logger.info("Generating audio for text of length %d with voice %s", len(text), voice_id)
+
+            # Normalize once up front so trivially different inputs
+            # (trailing spaces, doubled whitespace, combining forms) hash
+            # to the same cache key and reach the model identically.
+            text = self._normalize_text(text)
+
             # Validate and process parameters
             processed_params = self._process_params(params)
-            
-            # In a real implementation, we would call the actual TTS model
-            # audio_data = self.model.generate(text, voice_id, **processed_params)
-            
-            # For now, create a mock audio file
-            temp_dir = tempfile.gettempdir()
-            audio_file = Path(temp_dir) / f"kokoro_tts_{voice_id}_{hash(text) % 10000}.mp3"
-            
-            # Mock writing an audio file
-            with open(audio_file, "w") as f:
-                f.write("Mock audio data")
-            
+
+            # Content-addressed cache check: identical inputs map to the
+            # same key, so a repeat request returns the existing file.
+            cache_key = self._audio_cache_key(text, voice_id, processed_params)
+            cached = self._audio_cache.get(cache_key)
+            if cached is not None and os.path.exists(cached.file_path):
+                self._audio_cache.move_to_end(cache_key)
+                logger.info("Audio cache hit for voice %s", voice_id)
+                return cached
+
+            # In a real implementation, the model renders into a pooled
+            # sample buffer instead of allocating a fresh array per call:
+            #   est_samples = int(est_duration * sample_rate)
+            #   buf = self._pool.acquire(est_samples)
+            #   try:
+            #       self.model.generate_into(buf, text, voice_id, **processed_params)
+            #       audio_data = encode(buf)
+            #   finally:
+            #       self._pool.release(buf)
+
+            # For now, create a mock audio file. The cache key doubles as
+            # the file name: unlike hash(text), it is stable across
+            # processes (hash() varies with PYTHONHASHSEED). Plain string
+            # concatenation keeps Path construction off the hot path.
+            audio_file = f"{self._TMP_PREFIX}{cache_key}.mp3"
+
+            # Store-once: the name is content-addressed, so if the blob
+            # already exists (earlier process, evicted cache entry) its
+            # bytes are by construction the right ones and the write is
+            # skipped entirely.
+            self._publish_audio_blob(audio_file, b"Mock audio data")
+
             # Mock duration calculation based on text length and speech rate
             speech_rate = processed_params.get("speed", 1.0)
-            words = len(text.split())
+            words = _count_words(text)
             duration = (words / 150) * (1 / speech_rate)  # Assuming 150 wpm is normal
             
-            result = {
-                "file_path": str(audio_file),
-                "duration": duration,
-                "format": "mp3",
-                "sample_rate": 24000,
-                "text_length": len(text),
-                "voice_id": voice_id,
-                "parameters": processed_params
-            }
-            
-            logger.info(f"Generated audio file at {audio_file} with duration {duration:.2f}s")
+            result = TTSResult(
+                file_path=audio_file,
+                duration=duration,
+                text_length=len(text),
+                voice_id=voice_id,
+                parameters=processed_params,
+            )
+
+            self._audio_cache[cache_key] = result
+            while len(self._audio_cache) > self._audio_cache_max:
+                self._audio_cache.popitem(last=False)
+
+            logger.info("Generated audio file at %s with duration %.2fs", audio_file, duration)
             return result
-            
+
+        except ValueError:
+            # Invalid user-supplied parameters; let the caller map this
+            # to a 422 instead of wrapping it as an engine failure.
+            raise
         except Exception as e:
-            logger.error(f"Error generating audio: {str(e)}")
+            logger.error("Error generating audio: %s", e)
             raise TTSProcessingError(f"Failed to generate audio: {str(e)}")
     
+    async def agenerate_audio(
+        self,
+        text: str,
+        voice_id: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> TTSResult:
+        """
+        Async variant of generate_audio for request-serving coroutines.
+
+        Runs the synchronous pipeline (validation, synthesis, file write)
+        on a worker thread so the disk write -- a multi-MB blob once the
+        real model is wired in -- never blocks the event loop. Batch jobs
+        without a running loop should keep calling generate_audio.
+        """
+        return await asyncio.to_thread(self.generate_audio, text, voice_id, params)
+
+    def generate_audio_batch(
+        self,
+        items: List[Tuple[str, str, Optional[Dict[str, Any]]]]
+    ) -> List[TTSResult]:
+        """
+        Generate audio for a batch of (text, voice_id, params) requests.
+
+        Requests are grouped by voice and canonical parameter shape so
+        that, once the real Kokoro model is wired in, each group maps to
+        a single generate_batch forward pass instead of N batch-size-1
+        calls. Today each group member still goes through generate_audio
+        (parameter validation is memoized, so the per-item overhead is a
+        cache hit). Results are returned in input order.
+
+        Raises:
+            TTSModelNotFoundError: If the TTS model is not loaded
+            TTSProcessingError: If there's an error processing a text
+            ValueError: If any input is invalid
+        """
+        groups: "OrderedDict[Tuple[str, Any], List[int]]" = OrderedDict()
+        for pos, (text, voice_id, params) in enumerate(items):
+            params_key = tuple(sorted(
+                (k, tuple(v) if isinstance(v, list) else v)
+                for k, v in (params or {}).items()
+            ))
+            groups.setdefault((voice_id, params_key), []).append(pos)
+
+        results: List[Optional[TTSResult]] = [None] * len(items)
+        for (voice_id, _), positions in groups.items():
+            # Future batching hook: one model.generate_batch call per
+            # group, padded to the longest text.
+            for pos in positions:
+                text, _, params = items[pos]
+                results[pos] = self.generate_audio(text, voice_id, params)
+        return results
+
+    async def agenerate_audio_batch(
+        self,
+        items: List[Tuple[str, str, Optional[Dict[str, Any]]]]
+    ) -> List[TTSResult]:
+        """Async wrapper running generate_audio_batch on a worker thread."""
+        return await asyncio.to_thread(self.generate_audio_batch, items)
+
+    @staticmethod
+    def _normalize_text(text: str) -> str:
+        """Canonicalize text for hashing and synthesis.
+
+        NFC-normalizes combining forms and collapses whitespace runs, so
+        user-typed variants of the same sentence share one cache entry
+        and one tokenizer view.
+        """
+        return _WS_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+    @staticmethod
+    def _publish_audio_blob(path: Union[str, Path], data: bytes) -> None:
+        """
+        Publish a content-addressed audio blob, writing it at most once.
+
+        If the path already exists the blob was produced by an earlier
+        call (possibly in another process) and nothing is written -- for
+        N repeat requests that drops N-1 redundant writes. Otherwise the
+        bytes go to a private temp name first and are published with
+        os.replace, an atomic rename: concurrent readers and racing
+        writers only ever observe a complete file. The write itself is
+        a single unbuffered os.write; the buffered text-mode layer would
+        also mis-encode binary audio once real synthesis lands.
+        """
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _audio_cache_key(text: str, voice_id: str, processed_params: Dict[str, Any]) -> str:
+        """Stable content hash identifying one synthesis request."""
+        payload = orjson.dumps(
+            {"t": text, "v": voice_id, "p": processed_params},
+            option=orjson.OPT_SORT_KEYS,
+        )
+        return _payload_digest(payload)
+
     def _process_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process and validate the voice parameters.
-        
+
+        Delegates to the memoized validator when the params are hashable
+        (the common case); unhashable values fall back to a direct
+        validation pass. The returned dict is fresh per call, so callers
+        can mutate it without aliasing the cache.
+
         Args:
             params: The parameters to process
-            
+
         Returns:
             Processed parameters with defaults applied
-            
+
         Raises:
             ValueError: If any parameter is invalid
         """
-        processed = {}
-        
-        # Process pitch
-        if "pitch" in params:
-            pitch = params["pitch"]
-            if not isinstance(pitch, (int, float)):
-                raise ValueError("Pitch must be a number")
-            if pitch < -10.0 or pitch > 10.0:
-                raise ValueError("Pitch must be between -10.0 and 10.0")
-            processed["pitch"] = pitch
-        else:
-            processed["pitch"] = 0.0
-        
-        # Process speed
-        if "speed" in params:
-            speed = params["speed"]
-            if not isinstance(speed, (int, float)):
-                raise ValueError("Speed must be a number")
-            if speed < 0.5 or speed > 2.0:
-                raise ValueError("Speed must be between 0.5 and 2.0")
-            processed["speed"] = speed
-        else:
-            processed["speed"] = 1.0
-        
-        # Process emotion
-        valid_emotions = ["neutral", "happy", "sad", "angry"]
-        if "emotion" in params:
-            emotion = params["emotion"]
-            if not isinstance(emotion, str):
-                raise ValueError("Emotion must be a string")
-            if emotion not in valid_emotions:
-                raise ValueError(f"Emotion must be one of: {valid_emotions}")
-            processed["emotion"] = emotion
-        else:
-            processed["emotion"] = "neutral"
-        
-        # Process emphasis
-        if "emphasis" in params:
-            emphasis = params["emphasis"]
-            if not isinstance(emphasis, list):
-                raise ValueError("Emphasis must be a list of words")
-            processed["emphasis"] = emphasis
-        else:
+        # Zero-validation fast path: no params means the canonical
+        # defaults. Copied from the shared template rather than returned
+        # as a read-only proxy because the result is embedded in response
+        # dicts and serialized by orjson, which rejects mapping proxies.
+        if not params:
+            processed = dict(_DEFAULT_PROCESSED)
             processed["emphasis"] = []
-        
+            return processed
+
+        try:
+            items = tuple(sorted(
+                (k, tuple(v) if isinstance(v, list) else v)
+                for k, v in params.items()
+            ))
+            processed = dict(_process_params_cached(items))
+        except TypeError:
+            # Unhashable parameter value; validate without the cache.
+            return _validate_params(params)
+
+        processed["emphasis"] = list(processed["emphasis"])
         return processed
     
     def get_available_voices(self) -> List[Dict[str, Any]]:
@@ -253,7 +620,7 @@ class KokoroTTSService:
             self.ensure_model_loaded()
             return self.available_voices
         except TTSModelNotFoundError as e:
-            logger.error(f"Failed to get available voices: {str(e)}")
+            logger.error("Failed to get available voices: %s", e)
             raise
 
     def customize_voice(
@@ -291,48 +658,62 @@ class KokoroTTSService:
         try:
             self.ensure_model_loaded()
         except TTSModelNotFoundError as e:
-            logger.error(f"Model not loaded: {str(e)}")
+            logger.error("Model not loaded: %s", e)
             raise
         
         # Check if the base voice exists
-        voice_exists = any(voice["id"] == voice_id for voice in self.available_voices)
-        if not voice_exists:
-            available_ids = [voice["id"] for voice in self.available_voices]
-            raise ValueError(f"Base voice ID '{voice_id}' not found. Available voices: {available_ids}")
+        if voice_id not in self._voices_by_id:
+            raise ValueError(f"Base voice ID '{voice_id}' not found. Available voices: {self._available_ids}")
         
         try:
-            logger.info(f"Customizing voice {voice_id}")
+            logger.info("Customizing voice %s", voice_id)
             
             # In a real implementation, we would create a custom voice
             # new_voice_id = self.model.customize_voice(voice_id, **customizations)
             
-            # For now, create a mock custom voice ID
-            base_voice = next(voice for voice in self.available_voices if voice["id"] == voice_id)
-            new_voice_id = f"custom_{voice_id}_{len(self.available_voices) + 1}"
-            
-            # Add the new voice to available voices
-            new_voice = {
-                "id": new_voice_id,
-                "name": customizations.get("name", f"Customized {base_voice['name']}"),
-                "gender": base_voice["gender"],
-                "language": base_voice["language"],
-                "is_custom": True,
-                "base_voice_id": voice_id,
-                "customizations": customizations
-            }
-            
-            self.available_voices.append(new_voice)
-            
-            logger.info(f"Created customized voice with ID {new_voice_id}")
+            # For now, create a mock custom voice ID. Allocation and
+            # registration happen under the voice lock so concurrent
+            # calls get monotonic, collision-free ids (len()+1 raced).
+            base_voice = self._voices_by_id[voice_id]
+            with self._voice_lock:
+                new_voice_id = f"custom_{voice_id}_{next(self._voice_counter)}"
+
+                new_voice = {
+                    "id": new_voice_id,
+                    "name": customizations.get("name", f"Customized {base_voice['name']}"),
+                    "gender": base_voice["gender"],
+                    "language": base_voice["language"],
+                    "is_custom": True,
+                    "base_voice_id": voice_id,
+                    "customizations": customizations
+                }
+
+                self.available_voices.append(new_voice)
+                self._voices_by_id[new_voice_id] = new_voice
+                self._available_ids = list(self._voices_by_id)
+
+            logger.info("Created customized voice with ID %s", new_voice_id)
             return new_voice_id
-            
+
+        except ValueError:
+            # Invalid user-supplied input; surfaced as-is for 422 mapping.
+            raise
         except Exception as e:
-            logger.error(f"Error customizing voice: {str(e)}")
+            logger.error("Error customizing voice: %s", e)
             raise TTSProcessingError(f"Failed to customize voice: {str(e)}")
 
-# Singleton instance
-tts_service = KokoroTTSService()
+# Lazily constructed singleton. Building the service at import time
+# made every importer pay for construction under the import lock;
+# double-checked locking defers it to first use and stays safe when
+# concurrent threads race on the first call.
+_tts_service: Optional[KokoroTTSService] = None
+_tts_lock = threading.Lock()
 
 async def get_tts_service() -> KokoroTTSService:
     """Factory function to get the TTS service instance."""
-    return tts_service 
\ No newline at end of file
+    global _tts_service
+    if _tts_service is None:
+        with _tts_lock:
+            if _tts_service is None:
+                _tts_service = KokoroTTSService()
+    return _tts_service 
\ No newline at end of file